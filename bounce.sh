@@ -0,0 +1,18 @@
+#!/usr/bin/env bash
+# Render the whole bounce in ffmpeg alone: a black base plus an overlay whose
+# x/y expressions fold the motion back into the frame with a triangle wave.
+# No Python and no per-frame pixel work. The one thing this cannot do is
+# mirror the logo on east/west bounces.
+
+FPS="${1:-30}"
+DURATION="${2:-40}"
+VELOCITY="${3:-10}"  # pixels per frame, matching dvd.py
+LOGO="${4:-./input/goldfish-logo.png}"
+
+SPEED=$((VELOCITY * FPS))  # pixels per second
+
+ffmpeg -y \
+    -f lavfi -i "color=c=black:s=3840x2160:r=${FPS}:d=${DURATION}" \
+    -i "${LOGO}" \
+    -filter_complex "overlay=x='(W-w)-abs(mod((W-w)/2+${SPEED}*t,2*(W-w))-(W-w))':y='(H-h)-abs(mod((H-h)/2+${SPEED}*t,2*(H-h))-(H-h))'" \
+    -c:v libx264 -pix_fmt yuv420p ./output/dvd.mp4
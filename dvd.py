@@ -1,16 +1,15 @@
-import collections
 import dataclasses
 import argparse
-from collections.abc import Callable
 import pathlib
 import subprocess
-from typing import Tuple
+from typing import NamedTuple, Tuple
 
+import numpy as np
 from PIL import Image
 from tqdm import tqdm
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class AbsoluteBoundingBox:
     left_x: int
     right_x: int
@@ -52,133 +51,74 @@ class AbsoluteBoundingBox:
         )
 
 
-FrameResolution = collections.namedtuple(
-    "FrameResolution", (
-        "width",
-        "height",
-    )
-)
-VelocityFunction = Callable[[AbsoluteBoundingBox], AbsoluteBoundingBox]
+class FrameResolution(NamedTuple):
+    width: int
+    height: int
 
 
-def velocity_update(
-        next_location_velocity: VelocityFunction,
-        current_north_south_boundary_crossed: Callable,
-        current_east_west_boundary_crossed: Callable,
-        reverse_north_south_boundary_crossed: Callable,
-        reverse_east_west_boundary_crossed: Callable,
-        current_image_location: AbsoluteBoundingBox,
-        frame_resolution: FrameResolution,
+def compute_trajectory(
+        x: int,
+        y: int,
         velocity: int,
-):
-    new_location: AbsoluteBoundingBox = next_location_velocity(
-        current_image_location=current_image_location,
-        velocity=velocity,
-    )
-
-    north_boundary_delta = current_north_south_boundary_crossed(
-        image_location=new_location,
-        frame_resolution=frame_resolution,
-    )
-    east_boundary_delta = current_east_west_boundary_crossed(
-        image_location=new_location,
-        frame_resolution=frame_resolution,
-    )
-
-    new_velocity_keywords = dict(
-        current_image_location=new_location,
-    )
-
-    if north_boundary_delta == 0 and east_boundary_delta == 0:
-        return new_velocity_keywords
-    
-    new_location += (east_boundary_delta, north_boundary_delta)
-
-    if north_boundary_delta != 0:
-        # Crosses over North / South boundary, but not East / West boundary.
-        # We need to head in the opposite vertical direction.
-        new_velocity_keywords |= dict(
-            current_north_south_boundary_crossed=reverse_north_south_boundary_crossed,
-            reverse_north_south_boundary_crossed=current_north_south_boundary_crossed,
-        )
-        next_location_velocity = swaps[VERTICAL][next_location_velocity]
-    
-    if east_boundary_delta != 0:
-        # Does not cross over North / South boundary, but does cross East / West boundary.
-        # We need to head in the opposite horizontal direction.
-        new_velocity_keywords |= dict(
-            current_east_west_boundary_crossed=reverse_east_west_boundary_crossed,
-            reverse_east_west_boundary_crossed=current_east_west_boundary_crossed,
-            flip=True,
-        )
-        next_location_velocity = swaps[HORIZONTAL][next_location_velocity]
-        
-    # Reaching here means we crossed no boundaries, so keep in the same direction.
-    new_velocity_keywords["next_location_velocity"] = next_location_velocity
-    return new_velocity_keywords
-
-
-def move_southeast(current_image_location: AbsoluteBoundingBox, velocity: int) -> Tuple[int, int]:
-    return current_image_location + (velocity, velocity)
-
-
-def move_northeast(current_image_location: AbsoluteBoundingBox, velocity: int) -> Tuple[int, int]:
-    return current_image_location + (velocity, -velocity)
-
-
-def move_northwest(current_image_location: AbsoluteBoundingBox, velocity: int) -> Tuple[int, int]:
-    negative_velocity = -1 * velocity
-    return current_image_location + (negative_velocity, negative_velocity)
-
-
-def move_southwest(current_image_location: AbsoluteBoundingBox, velocity: int) -> Tuple[int, int]:
-    return current_image_location + (-velocity, velocity)
-
-
-def passes_north_boundary(image_location: AbsoluteBoundingBox, frame_resolution: FrameResolution) -> bool:
-    if image_location.top_y < 0:
-        return image_location.top_y
-    return 0
-
-
-def passes_west_boundary(image_location: AbsoluteBoundingBox, frame_resolution: FrameResolution) -> bool:
-    if image_location.left_x < 0:
-        return image_location.left_x
-    return 0
-
-
-def passes_south_boundary(image_location: AbsoluteBoundingBox, frame_resolution: FrameResolution) -> bool:
-    return min(0, frame_resolution.height - image_location.bottom_y)
-
-
-def passes_east_boundary(image_location: AbsoluteBoundingBox, frame_resolution: FrameResolution) -> bool:
-    return min(0, frame_resolution.width - image_location.right_x)
-
-
-HORIZONTAL = 0
-VERTICAL = 1
-
-swaps = [{
-    move_northeast: move_northwest,
-    move_southeast: move_southwest,
-    move_northwest: move_northeast,
-    move_southwest: move_southeast,
-}, {
-    move_northeast: move_southeast,
-    move_southeast: move_northeast,
-    move_northwest: move_southwest,
-    move_southwest: move_northwest,
-}]
+        frame_resolution: FrameResolution,
+        logo_size: Tuple[int, int],
+        frames_to_generate: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Closed-form bounce: unfold the motion onto an infinite line, then fold
+    # it back into the frame with a triangle wave. Every frame's position
+    # falls out of a handful of vectorized array ops instead of a per-frame
+    # stepping loop. Positions and flips come back structure-of-arrays style.
+    max_x = frame_resolution.width - logo_size[0]
+    max_y = frame_resolution.height - logo_size[1]
+    time = np.arange(frames_to_generate, dtype=np.int64)
+    unfolded_x = x + velocity * time
+    unfolded_y = y + velocity * time
+    xs = max_x - np.abs(unfolded_x % (2 * max_x) - max_x)
+    ys = max_y - np.abs(unfolded_y % (2 * max_y) - max_y)
+    # The logo starts out flipped and toggles on every east/west bounce,
+    # i.e. each time the unfolded position crosses a multiple of max_x.
+    flips = ((unfolded_x - 1) // max_x) % 2 == 0
+    return xs, ys, flips
+
+
+def build_sliding_canvases(
+        logo_image: Image.Image,
+        frame_resolution: FrameResolution,
+) -> Tuple[np.ndarray, int, int]:
+    # Composite each logo orientation once onto an oversized canvas. Since a
+    # frame is nothing but the logo at (x, y) on black, every frame is a
+    # window into this canvas: place the logo at (max_x, max_y) and crop the
+    # frame-sized window whose origin is (max_x - x, max_y - y). Rendering a
+    # frame then costs exactly one memcpy, with no paste or restore at all.
+    logo = logo_image.convert('RGBA')
+    logo_arrays = (
+        np.asarray(logo),
+        np.asarray(logo.transpose(Image.FLIP_LEFT_RIGHT)),
+    )
+    logo_height, logo_width = logo_arrays[0].shape[:2]
+    max_x = frame_resolution.width - logo_width
+    max_y = frame_resolution.height - logo_height
+    canvases = np.zeros(
+        (2, frame_resolution.height + max_y, frame_resolution.width + max_x, 4),
+        dtype=np.uint8,
+    )
+    for orientation, logo_array in enumerate(logo_arrays):
+        canvases[
+            orientation,
+            max_y:max_y + logo_height,
+            max_x:max_x + logo_width,
+        ] = logo_array
+    return canvases, max_x, max_y
 
 
 def main(args):
     logo_image = Image.open(args.logo)
+    # Trim fully transparent padding so the bounce extents and the center
+    # snapshots line up with the visible logo edges rather than the padding.
+    bounding_box = logo_image.getbbox()
+    if bounding_box is not None:
+        logo_image = logo_image.crop(bounding_box)
     resolution = FrameResolution(width=3840, height=2160)
-    frame = Image.new(
-        mode='RGBA',
-        size=resolution,
-        color=0,
-    )
 
     center_x = resolution[0] // 2
     center_y = resolution[1] // 2
@@ -192,64 +132,74 @@ def main(args):
     )
 
     frames_to_generate = args.duration * args.fps
-    digits = len(str(frames_to_generate))
 
     output_directory = pathlib.Path(args.output_directory) / args.logo.with_suffix("").name
     print(f"Output to {output_directory}/")
     output_directory.mkdir(exist_ok=True, parents=True)
 
-    # Get two flips in the center
-    initial_frame = frame.copy()
+    # Get two flips in the center. An unmasked paste overwrites the whole
+    # logo rectangle, so one canvas serves both snapshots without any
+    # full-frame copies in between.
+    initial_frame = Image.new(
+        mode='RGBA',
+        size=resolution,
+        color=0,
+    )
     initial_frame.paste(
         logo_image,
         (current_image_location.x, current_image_location.y)
     )
-    initial_frame.save(output_directory / 'left.png')
+    initial_frame.save(output_directory / 'left.png', compress_level=1, optimize=False)
 
-    initial_frame = frame.copy()
     initial_frame.paste(
         logo_image.transpose(Image.FLIP_LEFT_RIGHT),
         (current_image_location.x, current_image_location.y)
     )
-    initial_frame.save(output_directory / 'right.png')
+    initial_frame.save(output_directory / 'right.png', compress_level=1, optimize=False)
 
-    keywords = dict(
-        flip=True,
-        next_location_velocity=move_southeast,
+    xs, ys, flips = compute_trajectory(
+        x=current_image_location.x,
+        y=current_image_location.y,
         velocity=args.velocity,
-        current_north_south_boundary_crossed=passes_south_boundary,
-        current_east_west_boundary_crossed=passes_east_boundary,
-        reverse_north_south_boundary_crossed=passes_north_boundary,
-        reverse_east_west_boundary_crossed=passes_west_boundary,
         frame_resolution=resolution,
-        current_image_location=current_image_location,
-    )
-
+        logo_size=logo_image.size,
+        frames_to_generate=frames_to_generate,
+    )
+    trajectory = list(zip(xs.tolist(), ys.tolist(), flips.tolist()))
+
+    canvases, max_x, max_y = build_sliding_canvases(logo_image, resolution)
+
+    # Feed raw frames straight into an encoder instead of saving intermediate
+    # PNGs to disk and stitching them afterwards.
+    encoder = subprocess.Popen([
+        'ffmpeg',
+        '-y',
+        '-f', 'rawvideo',
+        '-pix_fmt', 'rgba',
+        '-s', f'{resolution.width}x{resolution.height}',
+        '-r', str(args.fps),
+        '-i', '-',
+        '-c:v', 'libx264',
+        '-pix_fmt', 'yuv420p',
+        str(output_directory / 'dvd.mp4'),
+    ], stdin=subprocess.PIPE)
+
+    # A frame is a single window slice off the sliding canvas -- one memcpy,
+    # so repeated positions are cheaper to re-slice than to cache.
     progress = tqdm(total=frames_to_generate, desc='Goldfish Bowl!')
-    for index in range(frames_to_generate):
+    for x, y, flipped in trajectory:
+        top = max_y - y
+        left = max_x - x
+        # int() matters: ndarrays treat a bare bool index as a mask.
+        encoder.stdin.write(canvases[
+            int(flipped),
+            top:top + resolution.height,
+            left:left + resolution.width,
+        ].tobytes())
         progress.update()
 
-        if keywords.pop("flip", False):
-            logo_image = logo_image.transpose(Image.FLIP_LEFT_RIGHT)
-        
-        current_frame = frame.copy()
-        current_image_location = keywords["current_image_location"]
-        current_frame.paste(
-            logo_image,
-            (current_image_location.x, current_image_location.y),
-        )
-        
-        frame_filename = str(index).zfill(digits)
-        current_frame.save(output_directory / f'{frame_filename}.png')
-
-        # Update the x and y direction based on current direction and potential boundary collisions.
-        keywords |= velocity_update(**keywords)
-    
-    subprocess.run([
-        './stitch.sh',
-        str(args.fps),
-        str(output_directory / ('%0' + str(digits) + 'd.png')),
-    ])
+    encoder.stdin.close()
+    encoder.wait()
 
 
 if __name__ == '__main__':
@@ -1,3 +1,4 @@
+import concurrent.futures
 import itertools
 import pathlib
 import subprocess
@@ -50,8 +51,34 @@ passes_boundary_functions = itertools.cycle([
 
 def main():
     input_image_directory = pathlib.Path('./input')
-    input_images = itertools.cycle(sorted(input_image_directory.glob('**/*')))
-    logo_image = Image.open(next(input_images))
+    # Load and quantize every logo once up front. All logos share one
+    # 255-color palette with index 0 reserved for the black background, so a
+    # single paletted canvas serves every frame: compositing moves one byte
+    # per pixel instead of four, and the flat frames compress tightly.
+    source_images = [
+        Image.open(path) for path in sorted(input_image_directory.glob('**/*'))
+    ]
+    # Quantize a contact sheet of every logo so the shared palette
+    # represents all of them, not just whichever file sorts first.
+    contact_sheet = Image.new(
+        mode='RGB',
+        size=(
+            sum(image.width for image in source_images),
+            max(image.height for image in source_images),
+        ),
+    )
+    offset = 0
+    for image in source_images:
+        contact_sheet.paste(image.convert('RGB'), (offset, 0))
+        offset += image.width
+    shared_palette = contact_sheet.quantize(colors=255)
+    palette_image = Image.new(mode='P', size=(1, 1))
+    palette_image.putpalette([0, 0, 0] + shared_palette.getpalette()[:765])
+    input_images = itertools.cycle([
+        image.convert('RGB').quantize(palette=palette_image, dither=Image.Dither.NONE)
+        for image in source_images
+    ])
+    logo_image = next(input_images)
 
     fps = 10
     duration = 10  # seconds
@@ -61,10 +88,11 @@ def main():
 
     resolution = 3840, 2160
     frame = Image.new(
-        mode='RGBA',
+        mode='P',
         size=resolution,
         color=0
     )
+    frame.putpalette(palette_image.getpalette())
 
     center_x = resolution[0] // 2
     center_y = resolution[1] // 2
@@ -80,30 +108,64 @@ def main():
     current_move_function = next(move_functions)
     current_boundary_function = next(passes_boundary_functions)
 
-    progress = tqdm(total=frames_to_generate, desc='Image Rendering')
-    for index in range(frames_to_generate):
-        progress.update()
-
-        current_frame = frame.copy()
-        current_frame.paste(
-            logo_image,
-            (paste_x, paste_y)
-        )
-
-        logo_image = Image.open(next(input_images))
+    # Only the previously pasted rectangle is dirty between frames, so reuse
+    # persistent canvases and restore just that patch instead of copying the
+    # whole frame every iteration. Two canvases alternate so one can be
+    # saved on the executor while the next frame is drawn on the other.
+    canvases = [frame, frame.copy()]
+    previous_pastes = [None, None]  # (transparent tile, box) per canvas
+    pending_saves = [None, None]
+    transparent_tiles = {}  # keyed by logo size
 
-        for boundary_function in current_boundary_function:
-            if boundary_function(top_x=paste_x, top_y=paste_y, bottom_x=paste_x + width, bottom_y=paste_y + height, width=resolution[0], height=resolution[1], velocity=velocity):
-                current_boundary_function = next(passes_boundary_functions)
-                current_move_function = next(move_functions)
-                break
-
-        paste_x, paste_y = current_move_function(x=paste_x, y=paste_y, velocity=velocity)
-
-        frame_filename = str(index).zfill(digits)
-        current_frame.save(output_directory / f'{frame_filename}.png')
-    
-    subprocess.run(['./stitch.sh', str(fps), str(output_directory / ('%0' + str(digits) + 'd.png'))])
+    progress = tqdm(total=frames_to_generate, desc='Image Rendering')
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as save_pool:
+        for index in range(frames_to_generate):
+            progress.update()
+
+            buffer = index % 2
+            canvas = canvases[buffer]
+            # Make sure this canvas is not still being written out.
+            if pending_saves[buffer] is not None:
+                pending_saves[buffer].result()
+
+            if previous_pastes[buffer] is not None:
+                canvas.paste(*previous_pastes[buffer])
+            transparent_tile = transparent_tiles.get(logo_image.size)
+            if transparent_tile is None:
+                transparent_tile = transparent_tiles[logo_image.size] = Image.new(
+                    mode='P',
+                    size=logo_image.size,
+                    color=0
+                )
+            canvas.paste(
+                logo_image,
+                (paste_x, paste_y)
+            )
+            previous_pastes[buffer] = (transparent_tile, (paste_x, paste_y))
+
+            # Lossless WebP at its fastest settings encodes these mostly
+            # flat frames to a few hundred KB, versus ~8 MB per raw BMP, so
+            # the disk stops being the bottleneck. The save overlaps with
+            # the position update and logo load for the next frame.
+            pending_saves[buffer] = save_pool.submit(
+                canvas.save,
+                output_directory / f'{index:0{digits}d}.webp',
+                lossless=True,
+                quality=0,
+                method=0,
+            )
+
+            logo_image = next(input_images)
+
+            for boundary_function in current_boundary_function:
+                if boundary_function(top_x=paste_x, top_y=paste_y, bottom_x=paste_x + width, bottom_y=paste_y + height, width=resolution[0], height=resolution[1], velocity=velocity):
+                    current_boundary_function = next(passes_boundary_functions)
+                    current_move_function = next(move_functions)
+                    break
+
+            paste_x, paste_y = current_move_function(x=paste_x, y=paste_y, velocity=velocity)
+
+    subprocess.run(['./mp4.sh', str(fps), str(output_directory / ('%0' + str(digits) + 'd.webp'))])
 
 
 if __name__ == '__main__':